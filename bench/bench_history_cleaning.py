@@ -0,0 +1,54 @@
+"""Time per-record and columnar cleaning of a /history backfill.
+
+Usage: python bench/bench_history_cleaning.py [COUNTRIES DAYS]   (default: 230 730)
+
+The columnar path needs NumPy.
+"""
+import sys
+from datetime import date, timedelta
+
+from common import best_of, setup
+
+app = setup()
+
+def synthetic_history(countries, days):
+    """/history entries for each country and day, shaped like the upstream payload"""
+    start = date(2022, 1, 1)
+    items = []
+    for n in range(countries):
+        for d in range(days):
+            day = (start + timedelta(days=d)).isoformat()
+            total = 1000 * d + n
+            items.append({
+                'continent': 'Europe',
+                'country': f'Country-{n:04d}',
+                'population': 1000000 + n,
+                'cases': {
+                    'new': f'+{d}', 'active': 100 * d, 'critical': None,
+                    'recovered': 900 * d, '1M_pop': None, 'total': total
+                },
+                'deaths': {'new': None, '1M_pop': str(d), 'total': 10 * d},
+                'tests': {'1M_pop': None, 'total': 5000 * d},
+                'day': day,
+                'time': f'{day}T12:00:00+00:00'
+            })
+    return items
+
+def clean_and_store(items):
+    app.db.session.query(app.CovidSnapshot).delete()
+    app.db.session.commit()
+    app.store_history_in_db(app.clean_history_data(items))
+
+def main(countries, days):
+    items = synthetic_history(countries, days)
+    print(f'{len(items):,} entries ({countries} countries x {days} days), best of 3')
+    modes = [('dict', False)] + ([('columnar', True)] if app.np is not None else [])
+    with app.app.app_context():
+        for name, columnar in modes:
+            app.app.config['INGEST_COLUMNAR'] = columnar
+            cleaning = best_of(3, lambda: list(app.clean_history_data(items)))
+            storing = best_of(3, lambda: clean_and_store(items))
+            print(f'{name:>10}  cleaning only {cleaning:.2f}s  clean + store {storing:.2f}s')
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]] or [230, 730])
@@ -0,0 +1,33 @@
+"""Time /api/records?per_page=500 with each JSON encoder the app supports.
+
+Usage: python bench/bench_json.py [REQUESTS]   (default: 200)
+
+Runs against a copy of the bundled instance/covid_data.db. orjson and
+ujson are measured only when they are installed; the stdlib fallback
+always is.
+"""
+import sys
+
+from common import setup, time_per_call, undecorated
+
+app = setup(copy_bundled=True)
+
+URL = '/api/records?per_page=500'
+
+def main(count):
+    view = undecorated(app.get_records)
+    encoders = {'orjson': app.orjson, 'ujson': app.ujson}
+    modes = [name for name, module in encoders.items() if module is not None] + ['stdlib']
+    
+    with app.app.test_request_context(URL):
+        payload = view().get_json()
+        print(f'{URL}: {len(payload["records"])} records, {count} requests each')
+        for mode in modes:
+            app.orjson = encoders['orjson'] if mode == 'orjson' else None
+            app.ujson = encoders['ujson'] if mode == 'ujson' else None
+            request_ms = time_per_call(lambda: view().get_data(), count)
+            encode_ms = time_per_call(lambda: app.app.json.encode(payload), count)
+            print(f'{mode:>8}  request {request_ms:.2f} ms  serialization {encode_ms:.2f} ms')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,61 @@
+"""Time the /api/records country filter with and without the FTS5 trigram index.
+
+Usage: python bench/bench_search.py [ROWS]   (default: 200000)
+
+Country names are drawn from the bundled instance/covid_data.db.
+"""
+import os
+import random
+import sqlite3
+import sys
+from datetime import datetime
+
+from common import ROOT, setup, time_per_call, undecorated
+
+app = setup()
+
+QUERIES = ['ger', 'germany-01', 'ia-0001', 'zzz', 'us']
+
+def bundled_countries():
+    """Country and continent names of the bundled database, read-only"""
+    path = os.path.join(ROOT, 'instance', 'covid_data.db')
+    with sqlite3.connect(f'file:{path}?mode=ro', uri=True) as conn:
+        countries = [row[0] for row in conn.execute('SELECT country FROM covid_records')]
+        continents = [row[0] for row in conn.execute('SELECT DISTINCT continent FROM covid_records')]
+    return countries, continents
+
+def populate(rows):
+    """Insert rows synthetic countries; the FTS triggers index them as they go"""
+    names, continents = bundled_countries()
+    random.seed(1)
+    now = datetime(2025, 1, 1)
+    app.db.session.execute(app.db.insert(app.CovidRecord), [
+        dict(
+            {metric: random.randint(0, 10 ** 7) for metric in app.SNAPSHOT_METRICS},
+            country=f'{random.choice(names)}-{n:06d}-{random.choice(names)}',
+            continent=random.choice(continents),
+            date_recorded=now
+        )
+        for n in range(rows)
+    ])
+    app.db.session.commit()
+
+def main(rows):
+    view = undecorated(app.get_records)
+    fts = app.country_search_enabled
+    if not fts:
+        print('FTS5 trigram index unavailable; timing ilike only')
+    with app.app.app_context():
+        populate(rows)
+        print(f'{rows:,} rows; ms per request')
+        print(f'{"query":>12} {"ilike":>8} {"fts":>8}')
+        for query in QUERIES:
+            with app.app.test_request_context(f'/api/records?per_page=10&country={query}'):
+                app.country_search_enabled = False
+                ilike = time_per_call(lambda: view().get_data(), 20)
+                app.country_search_enabled = fts
+                indexed = time_per_call(lambda: view().get_data(), 20)
+            print(f'{query:>12} {ilike:>8.1f} {indexed:>8.1f}')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,53 @@
+"""Time store_data_in_db on a second ingest of N synthetic countries.
+
+Usage: python bench/bench_store.py [N ...]   (default: 500 5000 50000)
+"""
+import sys
+import time
+
+from common import setup
+
+app = setup()
+
+def synthetic_records(count, generation):
+    """Cleaned records for count countries; every generation changes all values"""
+    return [
+        {
+            'country': f'Country-{n:06d}',
+            'country_code': f'C{n % 1000:03d}',
+            'continent': 'Europe',
+            'population': 1000000 + n,
+            'total_cases': 1000 * generation + n,
+            'new_cases': generation,
+            'total_deaths': 10 * generation + n,
+            'new_deaths': generation,
+            'total_recovered': 900 * generation,
+            'active_cases': 100 * generation,
+            'critical_cases': generation,
+            'cases_per_million': float(generation),
+            'deaths_per_million': float(generation),
+            'total_tests': 5000 * generation,
+            'tests_per_million': float(generation)
+        }
+        for n in range(count)
+    ]
+
+def main(sizes):
+    with app.app.app_context():
+        print(f'{"rows":>8} {"insert":>10} {"update":>10}')
+        for size in sizes:
+            app.db.session.query(app.CovidRecord).delete()
+            app.db.session.commit()
+            
+            start = time.perf_counter()
+            app.store_data_in_db(synthetic_records(size, 1))
+            inserted = time.perf_counter() - start
+            
+            # The case the original per-row loop was slowest at
+            start = time.perf_counter()
+            app.store_data_in_db(synthetic_records(size, 2))
+            updated = time.perf_counter() - start
+            print(f'{size:>8} {inserted:>9.2f}s {updated:>9.2f}s')
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [500, 5000, 50000])
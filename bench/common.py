@@ -0,0 +1,46 @@
+"""Setup and timing helpers shared by the benchmark scripts.
+
+Each script calls setup() before anything else. It runs the app against a
+throwaway SQLite database (optionally a copy of the bundled
+instance/covid_data.db) unless DATABASE_URL is set.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def setup(copy_bundled=False):
+    """Point DATABASE_URL at a throwaway database unless it is set, then import the app"""
+    if 'DATABASE_URL' not in os.environ:
+        database = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        if copy_bundled:
+            shutil.copy(os.path.join(ROOT, 'instance', 'covid_data.db'), database)
+        os.environ['DATABASE_URL'] = 'sqlite:///' + database
+    sys.path.insert(0, ROOT)
+    
+    import app
+    return app
+
+def undecorated(view):
+    """A read view without its response cache and conditional request handling"""
+    return view.__wrapped__.__wrapped__
+
+def time_per_call(func, count):
+    """Milliseconds per call of func, after one warm-up call"""
+    func()
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    return (time.perf_counter() - start) / count * 1000
+
+def best_of(runs, func):
+    """Fastest of runs calls of func, in seconds"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
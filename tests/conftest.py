@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# Point the app at a throwaway database before it is imported. An exported
+# DATABASE_URL is ignored, since the tests write to the database; set
+# TEST_DATABASE_URL to run them against another disposable database.
+os.environ['DATABASE_URL'] = os.getenv('TEST_DATABASE_URL') or (
+    'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'covid_data.db')
+)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
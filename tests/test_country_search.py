@@ -0,0 +1,87 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def search_index():
+    if not app.country_search_enabled:
+        pytest.skip('needs SQLite with the FTS5 trigram tokenizer')
+    with app.app.app_context():
+        yield
+
+
+def test_worker_losing_the_creation_race_keeps_the_index(search_index):
+    # What a worker that passed has_table() before another created the table runs
+    with app.db.engine.begin() as conn:
+        for statement in app.COUNTRY_SEARCH_DDL:
+            conn.execute(app.db.text(statement))
+    assert app.create_country_search_index()
+
+
+def record(country):
+    return dict(
+        {metric: 0 for metric in app.SNAPSHOT_METRICS},
+        country=country,
+        country_code=country[:3].upper(),
+        continent='Searchland'
+    )
+
+
+def index_ids(term):
+    """Rows the trigram index matches for a term"""
+    return set(app.db.session.scalars(
+        app.db.select(app.country_search.c.rowid)
+        .where(app.country_search.c.country.like(f'%{term}%'))
+    ))
+
+
+def table_ids(term):
+    return set(app.db.session.scalars(
+        app.db.select(app.CovidRecord.id).where(app.CovidRecord.country.ilike(f'%{term}%'))
+    ))
+
+
+def assert_index_in_sync(*terms):
+    for term in terms:
+        assert index_ids(term) == table_ids(term), term
+
+
+def test_triggers_keep_the_index_in_sync(search_index):
+    app.store_data_in_db([record('Searchonia'), record('Findlandia'), record('Lookupistan')])
+    assert_index_in_sync('searchon', 'landia', 'lookup', 'ia')
+    
+    # Renaming a country through an update
+    app.db.session.execute(
+        app.db.update(app.CovidRecord)
+        .where(app.CovidRecord.country == 'Findlandia')
+        .values(country='Seekerlandia')
+    )
+    app.db.session.commit()
+    assert not index_ids('findland')
+    assert_index_in_sync('findland', 'seeker', 'landia')
+    
+    # Duplicates removed by migrate_schema in a database from before the
+    # unique index
+    with app.db.engine.begin() as conn:
+        conn.execute(app.db.text('DROP INDEX uq_covid_records_country'))
+        conn.execute(app.db.text(
+            "INSERT INTO covid_records (country, continent) VALUES ('Lookupistan', 'Searchland')"
+        ))
+    assert len(index_ids('lookupist')) == 2
+    app.migrate_schema()
+    assert len(index_ids('lookupist')) == 1
+    assert_index_in_sync('lookupist', 'searchon', 'seeker')
+
+
+@pytest.mark.parametrize('term', [
+    'Searchonia', 'searchon', 'SEARCH', 'ndia', 'land', 'ia', 'S', 'a_i', '%look', 'istan', 'nowhere'
+])
+def test_search_matches_the_like_scan(search_index, monkeypatch, term):
+    app.store_data_in_db([record('Searchonia'), record('Lookupistan'), record('Seekerlandia')])
+    query = app.db.select(app.CovidRecord.id).order_by(app.CovidRecord.id)
+    
+    indexed = app.db.session.scalars(app.filter_records(query, term, '')).all()
+    monkeypatch.setattr(app, 'country_search_enabled', False)
+    scanned = app.db.session.scalars(app.filter_records(query, term, '')).all()
+    assert indexed == scanned
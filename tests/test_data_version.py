@@ -0,0 +1,123 @@
+import json
+import sqlite3
+import uuid
+from datetime import date
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    if app.database_url.get_backend_name() != 'sqlite':
+        pytest.skip('simulates another worker with a sqlite3 connection')
+    # Suggestions check the data version on every request unless a test
+    # sets an interval
+    monkeypatch.setitem(app.app.config, 'SUGGEST_VERSION_INTERVAL', 0)
+    return app.app.test_client()
+
+
+def record(country, total_cases):
+    return dict(
+        {metric: 0 for metric in app.SNAPSHOT_METRICS},
+        country=country,
+        country_code=country[:3].upper(),
+        continent='Europe',
+        total_cases=total_cases
+    )
+
+
+def ingest_in_other_worker(country, total_cases):
+    """Commit a row and a new data version the way another process would"""
+    connection = sqlite3.connect(app.database_url.database)
+    with connection:
+        connection.execute(
+            "INSERT INTO covid_records (country, continent, total_cases, date_recorded) "
+            "VALUES (?, 'Europe', ?, '2025-01-02 00:00:00')",
+            (country, total_cases)
+        )
+        connection.execute(
+            "UPDATE summary_entries SET payload = ? WHERE kind = 'data-version'",
+            (json.dumps({'version': uuid.uuid4().hex, 'last_modified': '2025-01-02T00:00:00'}),)
+        )
+    connection.close()
+
+
+def test_other_worker_ingest_is_seen(client):
+    with app.app.app_context():
+        app.store_data_in_db([record('Alphaland', 10), record('Betaland', 20)])
+    
+    url = '/api/records?sort_by=total_cases&order=desc&fields=country'
+    before = client.get(url)
+    assert [r['country'] for r in before.get_json()['records']][:2] == ['Betaland', 'Alphaland']
+    assert client.get('/api/countries/suggest?q=gamma').get_json() == {'suggestions': []}
+    
+    ingest_in_other_worker('Gammaland', 30)
+    
+    # Neither the cached body, the validators nor the indexes may be stale
+    assert client.get(url, headers={'If-None-Match': before.headers['ETag']}).status_code == 200
+    after = client.get(url)
+    assert after.headers['ETag'] != before.headers['ETag']
+    assert [r['country'] for r in after.get_json()['records']][:3] == ['Gammaland', 'Betaland', 'Alphaland']
+    suggestions = client.get('/api/countries/suggest?q=gamma').get_json()['suggestions']
+    assert [s['country'] for s in suggestions] == ['Gammaland']
+
+
+def test_history_backfill_changes_series(client):
+    url = '/api/countries/Deltaland/series'
+    before = client.get(url)
+    assert before.get_json()['total_points'] == 0
+    
+    snapshot = dict({metric: 5 for metric in app.SNAPSHOT_METRICS}, country='Deltaland')
+    with app.app.app_context():
+        assert app.store_history_in_db([
+            dict(snapshot, snapshot_date=date(2024, 1, 1)),
+            dict(snapshot, snapshot_date=date(2024, 1, 2))
+        ]) == 2
+    
+    assert client.get(url, headers={'If-None-Match': before.headers['ETag']}).status_code == 200
+    after = client.get(url)
+    assert after.get_json()['total_points'] == 2
+    assert after.headers['ETag'] != before.headers['ETag']
+
+
+def test_suggestions_between_version_checks_skip_the_database(client, monkeypatch):
+    monkeypatch.setitem(app.app.config, 'SUGGEST_VERSION_INTERVAL', 60)
+    statements = []
+    
+    def record_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+    
+    assert client.get('/api/countries/suggest?q=zeta').get_json() == {'suggestions': []}
+    app.db.event.listen(app.read_engine, 'before_cursor_execute', record_statement)
+    try:
+        ingest_in_other_worker('Zetaland', 40)
+        # Within the interval the other worker's ingest is not seen yet
+        for _ in range(3):
+            assert client.get('/api/countries/suggest?q=zeta').get_json() == {'suggestions': []}
+        assert statements == []
+        
+        # Once it has passed, the version is read and the index rebuilt
+        monkeypatch.setattr(app.country_index, 'checked_at', app.country_index.checked_at - 60)
+        suggestions = client.get('/api/countries/suggest?q=zeta').get_json()['suggestions']
+        assert [s['country'] for s in suggestions] == ['Zetaland']
+        assert statements
+    finally:
+        app.db.event.remove(app.read_engine, 'before_cursor_execute', record_statement)
+
+
+def test_ingests_within_one_second_change_last_modified(client):
+    url = '/api/statistics'
+    with app.app.app_context():
+        app.store_data_in_db([record('Etaland', 1)])
+        first = client.get(url)
+        app.store_data_in_db([record('Etaland', 2)])
+    
+    # Only If-Modified-Since, as a client without ETag support would send
+    response = client.get(url, headers={'If-Modified-Since': first.headers['Last-Modified']})
+    assert response.status_code == 200
+    assert response.last_modified > first.last_modified
+    assert client.get(
+        url, headers={'If-Modified-Since': response.headers['Last-Modified']}
+    ).status_code == 304
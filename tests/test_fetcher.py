@@ -0,0 +1,166 @@
+import json
+import threading
+import time
+import weakref
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import app
+
+
+class StubUpstream(BaseHTTPRequestHandler):
+    """covid-193 stand-in whose behaviour each test sets on the server"""
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        server = self.server
+        with server.lock:
+            server.requests.append((url.path, params))
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            status, body = server.handler(url.path, params)
+        finally:
+            with server.lock:
+                server.active -= 1
+        
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on a slow response
+            pass
+    
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubUpstream)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.active = 0
+    server.max_active = 0
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    
+    monkeypatch.setitem(app.app.config, 'COVID_API_BASE_URL', f'http://127.0.0.1:{server.server_port}')
+    monkeypatch.setitem(app.app.config, 'FETCH_BACKOFF', 0)
+    monkeypatch.setitem(app.app.config, 'FETCH_TIMEOUT', 0.2)
+    monkeypatch.setattr(app, 'http_session', app.create_http_session())
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def payload(items):
+    return json.dumps({'get': 'x', 'errors': [], 'response': items}).encode()
+
+
+def entry(country, day=None, total=100):
+    return {
+        'country': country,
+        'continent': 'Europe',
+        'population': 1000000,
+        'day': day,
+        'time': f'{day}T12:00:00+00:00' if day else None,
+        'cases': {'total': total, 'new': '+1'},
+        'deaths': {'total': 1},
+        'tests': {'total': 10}
+    }
+
+
+def test_retries_service_unavailable(upstream):
+    failures = iter([503, 503])
+    upstream.handler = lambda path, params: (next(failures, 200), payload([entry('France')]))
+    
+    raw_data = app.fetch_covid_data()
+    assert [item['country'] for item in raw_data['response']] == ['France']
+    assert len(upstream.requests) == 3
+
+
+def test_gives_up_after_retries(upstream):
+    upstream.handler = lambda path, params: (503, payload([]))
+    
+    assert app.fetch_covid_data() is None
+    assert len(upstream.requests) == app.app.config['FETCH_RETRIES'] + 1
+
+
+def test_times_out_slow_responses(upstream):
+    def slow(path, params):
+        time.sleep(0.5)
+        return 200, payload([entry('France')])
+    upstream.handler = slow
+    
+    started = time.monotonic()
+    assert app.fetch_covid_data() is None
+    # Every attempt is cut off by FETCH_TIMEOUT instead of waiting the response out
+    assert time.monotonic() - started < 0.5 * len(upstream.requests)
+    assert len(upstream.requests) == app.app.config['FETCH_RETRIES'] + 1
+
+
+def test_history_fans_out_concurrently(upstream):
+    def history(path, params):
+        time.sleep(0.05)
+        if params['country'] == 'Atlantis':
+            return 404, payload([])
+        return 200, payload([entry(params['country'], params['day'])])
+    upstream.handler = history
+    
+    countries = ['France', 'Italy', 'Spain', 'Atlantis']
+    days = [date(2024, 1, 1), date(2024, 1, 2)]
+    stats = {}
+    snapshots = list(app.fetch_covid_history(countries, days, stats))
+    
+    assert sorted((s['country'], s['snapshot_date']) for s in snapshots) == [
+        (country, day) for country in ['France', 'Italy', 'Spain'] for day in days
+    ]
+    assert stats == {'requests': 8, 'failed_requests': 2}
+    assert sorted((params['country'], params['day']) for path, params in upstream.requests) == sorted(
+        (country, day.isoformat()) for country in countries for day in days
+    )
+    assert {path for path, params in upstream.requests} == {'/history'}
+    assert upstream.max_active > 1
+
+
+class Snapshot(dict):
+    """A dict that can be tracked in a WeakSet"""
+    
+    __hash__ = object.__hash__
+
+
+def test_history_memory_is_bounded(monkeypatch):
+    monkeypatch.setitem(app.app.config, 'FETCH_WORKERS', 2)
+    live = weakref.WeakSet()
+    requested = []
+    
+    def fetch(params):
+        requested.append(params)
+        snapshots = [Snapshot(country=params['country'], n=n) for n in range(50)]
+        live.update(snapshots)
+        return snapshots
+    monkeypatch.setattr(app, 'fetch_history_snapshots', fetch)
+    
+    countries = [f'Country-{n}' for n in range(100)]
+    stream = app.fetch_covid_history(countries, [date(2024, 1, 1)], {})
+    next(stream)
+    # A consumer that stops reading holds the fetch back
+    time.sleep(0.05)
+    assert len(requested) <= 2 * 2 + 1
+    
+    count = 1
+    most_live = 0
+    for snapshot in stream:
+        count += 1
+        most_live = max(most_live, len(live))
+    assert count == 100 * 50
+    # Only the snapshots of the requests in flight are held, not the whole run
+    assert most_live <= (2 * 2 + 1) * 50
@@ -0,0 +1,57 @@
+import pytest
+
+import app
+
+np = pytest.importorskip('numpy')
+
+
+def entry(country, day, time='12:00', **values):
+    return dict({
+        'country': country,
+        'continent': 'Europe',
+        'population': 2000000,
+        'day': day,
+        'time': f'{day}T{time}:00+00:00',
+        'cases': {'new': '+5', 'active': 10, 'critical': None, 'recovered': 40,
+                  '1M_pop': '25', 'total': 50},
+        'deaths': {'new': None, '1M_pop': None, 'total': 3},
+        'tests': {'1M_pop': None, 'total': '1000'}
+    }, **values)
+
+
+ENTRIES = [
+    entry('France', '2024-01-01', '08:00'),
+    entry('France', '2024-01-01', '20:00', population='3000000'),
+    entry('France', '2024-01-02', tests=None),
+    entry('All', '2024-01-02'),
+    entry('Italy', '2024-01-01', cases=None, deaths=None),
+    entry('Italy', '2024-01-02', population=None),
+    entry('Spain', '2024-01-01', population=0, cases={'total': '1e3'}),
+    entry('  ', '2024-01-01'),
+    entry(' Peru ', '2024-01-01', deaths={'total': 7.9}),
+    entry('Chile', '2024-01-01', cases={'total': 'n/a'}),
+    dict(entry('Chad', '2024-01-01'), day=None),
+    entry('Cuba', '2024-01-02', cases={'total': 12}, tests={}),
+]
+
+
+def clean(monkeypatch, columnar, entries):
+    monkeypatch.setitem(app.app.config, 'INGEST_COLUMNAR', columnar)
+    return list(app.clean_history_data(iter(entries)))
+
+
+@pytest.mark.parametrize('batch_size', [1, 3, 1000])
+def test_columnar_matches_per_record_cleaning(monkeypatch, batch_size):
+    monkeypatch.setattr(app, 'WRITE_BATCH_SIZE', batch_size)
+    expected = clean(monkeypatch, False, ENTRIES)
+    
+    assert clean(monkeypatch, True, ENTRIES) == expected
+    assert [(s['country'], s['snapshot_date'].isoformat()) for s in expected] == [
+        ('France', '2024-01-01'), ('France', '2024-01-02'),
+        ('Italy', '2024-01-01'), ('Italy', '2024-01-02'),
+        ('Spain', '2024-01-01'), ('Peru', '2024-01-01'), ('Cuba', '2024-01-02')
+    ]
+    # Types match too, not only values that compare equal
+    for snapshot in clean(monkeypatch, True, ENTRIES):
+        for metric, python_type in app.METRIC_TYPES.items():
+            assert type(snapshot[metric]) is python_type
@@ -0,0 +1,78 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def sqlite_only():
+    if app.database_url.get_backend_name() != 'sqlite':
+        pytest.skip('takes the write lock with a sqlite3 connection')
+
+
+def snapshot(country, snapshot_date):
+    return dict(
+        {metric: 1 for metric in app.SNAPSHOT_METRICS},
+        country=country,
+        snapshot_date=snapshot_date
+    )
+
+
+def test_backfill_does_not_hold_the_write_lock(sqlite_only, monkeypatch):
+    monkeypatch.setattr(app, 'WRITE_BATCH_SIZE', 1)
+    
+    def slow_stream():
+        yield snapshot('Epsilonland', date(2023, 1, 1))
+        # While the next /history response downloads, another writer must
+        # get the lock well within its busy timeout
+        connection = sqlite3.connect(app.database_url.database, timeout=0.1)
+        with connection:
+            connection.execute(
+                "UPDATE summary_entries SET payload = payload WHERE kind = 'data-version'"
+            )
+        connection.close()
+        yield snapshot('Epsilonland', date(2023, 1, 2))
+    
+    with app.app.app_context():
+        assert app.store_history_in_db(slow_stream()) == 2
+        stored = app.db.session.query(app.CovidSnapshot.snapshot_date)\
+            .filter_by(country='Epsilonland').count()
+    assert stored == 2
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    """Record backfill jobs instead of starting them"""
+    calls = []
+    
+    def submit(job_type, params, func, *args):
+        calls.append(args)
+        return {'id': 'job'}
+    
+    monkeypatch.setattr(app.job_runner, 'submit', submit)
+    return calls
+
+
+def test_inverted_range_is_rejected(submitted):
+    response = app.app.test_client().get(
+        '/api/fetch-history?countries=France&from=2024-02-01&to=2024-01-01'
+    )
+    assert response.status_code == 400
+    assert submitted == []
+
+
+def test_backfill_size_is_capped(submitted, monkeypatch):
+    monkeypatch.setitem(app.app.config, 'HISTORY_MAX_REQUESTS', 62)
+    client = app.app.test_client()
+    
+    # Two countries for 31 days is at the limit, three countries are over it
+    url = '/api/fetch-history?from=2024-01-01&to=2024-01-31&countries='
+    assert client.get(url + 'France,Italy').status_code == 202
+    response = client.get(url + 'France,Italy,Spain')
+    assert response.status_code == 400
+    assert '93' in response.get_json()['error']
+    [(countries, days)] = submitted
+    assert countries == ['France', 'Italy']
+    assert (days[0], days[-1], len(days)) == (date(2024, 1, 1), date(2024, 1, 31), 31)
@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+import app
+
+
+class ChunkedResponse:
+    """Stand-in for a streamed requests response that yields fixed-size chunks"""
+    
+    def __init__(self, body, size):
+        self.body = body
+        self.size = size
+    
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), self.size):
+            yield self.body[start:start + self.size]
+    
+    def close(self):
+        pass
+
+
+ITEMS = [
+    {'country': 'Côte d\'Ivoire', 'cases': {'new': '+12', 'total': 87654321}},
+    {'country': 'X', 'ratio': 1.5, 'tiny': 2.5e-7, 'big': -3E+12, 'zero': 0},
+    {'country': 'Y', 'flags': [True, False, None], 'values': [10, 200.25, 3e5]},
+    12345.678,
+    -0.5,
+]
+DOCUMENT = json.dumps({
+    'get': 'statistics',
+    'errors': [],
+    'results': 1.25e3,
+    'response': ITEMS,
+    'trailer': 99.5,
+}).encode()
+
+
+@pytest.mark.parametrize('size', range(1, len(DOCUMENT) + 1))
+def test_every_chunk_size(size):
+    assert list(app.iter_json_array(ChunkedResponse(DOCUMENT, size), 'response')) == ITEMS
+
+
+@pytest.mark.parametrize('size', [1, 7, 64])
+def test_truncated_stream_raises(size):
+    with pytest.raises(ValueError):
+        list(app.iter_json_array(ChunkedResponse(DOCUMENT[:-30], size), 'response'))
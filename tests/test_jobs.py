@@ -0,0 +1,79 @@
+import threading
+from datetime import datetime
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def context():
+    with app.app.app_context():
+        yield
+
+
+def wait_until_finished(runner, job_id):
+    for _ in range(200):
+        job = runner.get(job_id)
+        if job['status'] not in ('queued', 'running'):
+            return job
+        threading.Event().wait(0.01)
+    raise AssertionError(f'job {job_id} did not finish')
+
+
+def test_workers_share_the_job_in_flight(context):
+    # Two runners stand in for two worker processes sharing the database
+    first, second = app.JobRunner(100, 60), app.JobRunner(100, 60)
+    release = threading.Event()
+    
+    def work(value):
+        release.wait(5)
+        return {'value': value}
+    
+    job = first.submit('test-shared', ('a',), work, 1)
+    assert second.submit('test-shared', ('a',), work, 2)['id'] == job['id']
+    other = second.submit('test-shared', ('b',), work, 3)
+    assert other['id'] != job['id']
+    
+    release.set()
+    finished = wait_until_finished(second, job['id'])
+    assert finished['status'] == 'succeeded'
+    assert finished['result'] == {'value': 1}
+    assert isinstance(finished['finished_at'], datetime)
+    wait_until_finished(first, other['id'])
+    
+    # Once finished, the same params start a new job
+    again = second.submit('test-shared', ('a',), work, 4)
+    assert again['id'] != job['id']
+    assert wait_until_finished(first, again['id'])['result'] == {'value': 4}
+
+
+def test_failed_job_reports_error(context):
+    runner = app.JobRunner(100, 60)
+    
+    def fail():
+        raise RuntimeError('upstream down')
+    
+    job = wait_until_finished(runner, runner.submit('test-failed', (), fail)['id'])
+    assert (job['status'], job['error']) == ('failed', 'upstream down')
+
+
+def test_job_of_a_stopped_worker_is_failed(context):
+    # A running job without a live lease lost the process running it
+    with app.db.engine.begin() as conn:
+        conn.execute(app.db.insert(app.IngestJob).values(
+            id='abandoned', type='fetch-data', status='running',
+            created_at=datetime(2024, 1, 1), started_at=datetime(2024, 1, 1)
+        ))
+    job = app.JobRunner(100, 60).get('abandoned')
+    assert job['status'] == 'failed'
+    assert job['error']
+
+
+def test_only_one_process_holds_the_scheduler_lease(context):
+    assert app.try_acquire_lease('test-scheduler', 'worker-a', 60)
+    assert not app.try_acquire_lease('test-scheduler', 'worker-b', 60)
+    # The holder renews it; an expired lease can be taken over
+    assert app.try_acquire_lease('test-scheduler', 'worker-a', -1)
+    assert app.try_acquire_lease('test-scheduler', 'worker-b', 60)
+    assert not app.try_acquire_lease('test-scheduler', 'worker-a', 60)
@@ -0,0 +1,31 @@
+import math
+
+import pytest
+
+import app
+
+
+@pytest.mark.parametrize('count, threshold', [(1000, 3), (1000, 10), (1000, 500), (101, 100), (7, 5)])
+def test_keeps_threshold_points_with_both_ends(count, threshold):
+    xs = list(range(count))
+    ys = [math.sin(x / 10) * x for x in xs]
+    kept = app.lttb(xs, ys, threshold)
+    
+    assert len(kept) == threshold
+    assert kept[0] == 0
+    assert kept[-1] == count - 1
+    # Strictly increasing: one point per bucket, in order
+    assert all(a < b for a, b in zip(kept, kept[1:]))
+
+
+@pytest.mark.parametrize('count', [0, 1, 2, 10])
+def test_short_series_are_kept_whole(count):
+    xs = list(range(count))
+    assert app.lttb(xs, [x * 2 for x in xs], 10) == xs
+
+
+def test_keeps_the_peak():
+    xs = list(range(100))
+    ys = [0] * 100
+    ys[42] = 1000
+    assert 42 in app.lttb(xs, ys, 10)
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+from flask_sqlalchemy.query import Query
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+import app
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    """Ingest into a database of its own, so the SQL order covers only these rows"""
+    engine = create_engine(f'sqlite:///{tmp_path / "ranking.db"}')
+    app.db.metadata.create_all(engine)
+    session = scoped_session(sessionmaker(bind=engine, query_cls=Query))
+    monkeypatch.setattr(app.db, 'session', session)
+    monkeypatch.setattr(app, 'storage', app.create_storage_backend(engine))
+    monkeypatch.setattr(app, 'response_cache', app.ResponseCache(16))
+    monkeypatch.setattr(app, 'country_index', app.CountryIndex())
+    monkeypatch.setattr(app, 'ranking_index', app.RankingIndex())
+    with app.app.app_context():
+        yield session
+    session.remove()
+    engine.dispose()
+
+
+def records(seed, count):
+    """Records with repeated and NULL metric values and a few continents"""
+    rng = random.Random(seed)
+    continents = ['Europe', 'Asia', 'Africa', None]
+    return [
+        dict(
+            {
+                metric: rng.choice([None, 0, 5, 5, 10, 2.5 * n])
+                for metric in app.SNAPSHOT_METRICS
+            },
+            country=f'Country-{n:02d}',
+            country_code=f'C{n:02d}',
+            continent=rng.choice(continents)
+        )
+        for n in range(count)
+    ]
+
+
+def sql_page(session, name, continent, order, offset, limit):
+    """The page ORDER BY <column>, id gives (NULLs first, as in SQLite)"""
+    column = app.SORTABLE_COLUMNS[name]
+    query = app.db.select(app.CovidRecord.id)
+    if continent is not None:
+        query = query.where(app.CovidRecord.continent == continent)
+    if order == 'desc':
+        query = query.order_by(app.db.desc(column).nulls_last(), app.db.desc(app.CovidRecord.id))
+    else:
+        query = query.order_by(app.db.asc(column).nulls_first(), app.db.asc(app.CovidRecord.id))
+    ids = session.scalars(query).all()
+    return ids[offset:offset + limit], len(ids)
+
+
+def assert_pages_match(session):
+    for name in app.SORTABLE_COLUMNS:
+        for continent in [None, 'Europe', 'Asia', 'Africa', 'Antarctica']:
+            for order in ['asc', 'desc']:
+                for offset, limit in [(0, 5), (3, 4), (7, 1), (0, 100), (28, 5), (40, 5)]:
+                    assert app.ranking_index.page(name, continent, order, offset, limit) == \
+                        sql_page(session, name, continent, order, offset, limit), \
+                        (name, continent, order, offset, limit)
+
+
+def test_pages_match_sql_order(session):
+    app.store_data_in_db(records(1, 30))
+    assert_pages_match(session)
+    
+    # A second ingest changes values, continents and adds countries
+    app.store_data_in_db(records(2, 36))
+    assert_pages_match(session)
+    
+    # Rebuilding from the database gives the same index
+    rebuilt = app.RankingIndex()
+    rebuilt.rebuild(session)
+    assert rebuilt.data == app.ranking_index.data
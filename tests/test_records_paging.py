@@ -0,0 +1,78 @@
+import base64
+import json
+
+import pytest
+
+import app
+
+
+CASES = {
+    'Tie-A': 10, 'Tie-B': None, 'Tie-C': 10, 'Tie-D': 20, 'Tie-E': None,
+    'Tie-F': 10, 'Tie-G': 20, 'Tie-H': None
+}
+
+
+def cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+@pytest.mark.parametrize('payload', [
+    [[1], 2], [{'a': 1}, 2], [True, 2], [1, '2'], [1, 2.5], [1, None], [1, 2, 3], {'a': 1, 'b': 2}, 'ab'
+])
+def test_malformed_cursor_is_rejected(payload):
+    response = app.app.test_client().get(
+        '/api/records?sort_by=total_cases&cursor=' + cursor(payload)
+    )
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid cursor'}
+
+
+@pytest.mark.parametrize('sort_value', ['France', 10, 2.5, None])
+def test_cursor_round_trip(sort_value):
+    assert app.decode_cursor(app.encode_cursor(sort_value, 7)) == (sort_value, 7)
+
+
+@pytest.fixture(scope='module')
+def tied_records():
+    """Countries of their own continent whose total_cases tie across pages"""
+    with app.app.app_context():
+        app.store_data_in_db([
+            dict(
+                {metric: 0 for metric in app.SNAPSHOT_METRICS},
+                country=country,
+                country_code=country[-1],
+                continent='Tieland',
+                total_cases=total_cases
+            )
+            for country, total_cases in CASES.items()
+        ])
+
+
+def walk_pages(client, order, per_page):
+    records = []
+    next_cursor = ''
+    while next_cursor is not None:
+        response = client.get(
+            f'/api/records?continent=Tieland&sort_by=total_cases&order={order}'
+            f'&per_page={per_page}&fields=id,country,total_cases&cursor={next_cursor}'
+        )
+        body = response.get_json()
+        assert len(body['records']) <= per_page
+        records.extend(body['records'])
+        next_cursor = body['next_cursor']
+    return records
+
+
+@pytest.mark.parametrize('order', ['asc', 'desc'])
+@pytest.mark.parametrize('per_page', [1, 2, 3, 5, 8])
+def test_ties_across_page_boundaries(tied_records, order, per_page):
+    records = walk_pages(app.app.test_client(), order, per_page)
+    
+    # Every record once, ordered by (total_cases, id) with NULLs first
+    assert sorted(r['country'] for r in records) == sorted(CASES)
+    expected = sorted(
+        records,
+        key=lambda r: (r['total_cases'] is not None, r['total_cases'] or 0, r['id']),
+        reverse=order == 'desc'
+    )
+    assert records == expected
@@ -0,0 +1,156 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from datetime import date
+
+import pytest
+from flask_sqlalchemy.query import Query
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+import app
+
+
+def start_postgres():
+    """Yield the URL of a PostgreSQL server: TEST_POSTGRES_URL or a throwaway cluster"""
+    pytest.importorskip('psycopg2')
+    if os.getenv('TEST_POSTGRES_URL'):
+        yield os.environ['TEST_POSTGRES_URL']
+        return
+    
+    initdb = shutil.which('initdb')
+    pg_ctl = shutil.which('pg_ctl')
+    if not initdb or not pg_ctl:
+        pytest.skip('no PostgreSQL server: set TEST_POSTGRES_URL or install initdb')
+    
+    directory = tempfile.mkdtemp()
+    data = os.path.join(directory, 'data')
+    subprocess.run([initdb, '-D', data, '-U', 'postgres', '--auth=trust'],
+                   check=True, capture_output=True)
+    subprocess.run([pg_ctl, '-D', data, '-w', '-l', os.path.join(directory, 'log'),
+                    '-o', f"-k {directory} -c listen_addresses=''", 'start'],
+                   check=True, capture_output=True)
+    try:
+        yield f'postgresql://postgres@/postgres?host={directory}'
+    finally:
+        subprocess.run([pg_ctl, '-D', data, '-w', '-m', 'fast', 'stop'], capture_output=True)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture(scope='module')
+def postgres_url():
+    yield from start_postgres()
+
+
+@pytest.fixture(params=['sqlite', 'postgresql'])
+def engine(request, tmp_path):
+    if request.param == 'sqlite':
+        engine = create_engine(f'sqlite:///{tmp_path / "backend.db"}')
+    else:
+        engine = create_engine(request.getfixturevalue('postgres_url'))
+    app.db.metadata.create_all(engine)
+    yield engine
+    app.db.metadata.drop_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine, monkeypatch):
+    """Point the ingest path at the engine under test"""
+    session = scoped_session(sessionmaker(bind=engine, query_cls=Query))
+    monkeypatch.setattr(app.db, 'session', session)
+    monkeypatch.setattr(app, 'storage', app.create_storage_backend(engine))
+    monkeypatch.setattr(app, 'response_cache', app.ResponseCache(16))
+    monkeypatch.setattr(app, 'country_index', app.CountryIndex())
+    monkeypatch.setattr(app, 'ranking_index', app.RankingIndex())
+    with app.app.app_context():
+        yield session
+    session.remove()
+
+
+def record(country, total_cases, continent='Europe'):
+    return {
+        'country': country,
+        'country_code': country[:3].upper(),
+        'continent': continent,
+        'population': 1000000,
+        'total_cases': total_cases,
+        'new_cases': 10,
+        'total_deaths': total_cases // 100,
+        'new_deaths': 1,
+        'total_recovered': total_cases // 2,
+        'active_cases': total_cases // 2,
+        'critical_cases': 5,
+        'cases_per_million': float(total_cases),
+        'deaths_per_million': 1.5,
+        'total_tests': total_cases * 10,
+        'tests_per_million': 2.5
+    }
+
+
+def stored_cases(session):
+    return {
+        country: (record_id, total_cases)
+        for country, record_id, total_cases in session.query(
+            app.CovidRecord.country, app.CovidRecord.id, app.CovidRecord.total_cases
+        )
+    }
+
+
+def test_backend_matches_dialect(session, engine):
+    expected = app.PostgresStorageBackend if engine.dialect.name == 'postgresql' else app.StorageBackend
+    assert type(app.storage) is expected
+
+
+def test_insert_update_and_snapshots(session):
+    counts = app.store_data_in_db([record('France', 100), record('Japan', 200, 'Asia')])
+    assert counts == {'records_count': 2, 'changed_count': 2, 'unchanged_count': 0}
+    inserted = stored_cases(session)
+    assert {country: cases for country, (_, cases) in inserted.items()} == {'France': 100, 'Japan': 200}
+    
+    counts = app.store_data_in_db([
+        record('France', 150), record('Japan', 200, 'Asia'), record('Peru', 50, 'South-America')
+    ])
+    assert counts == {'records_count': 3, 'changed_count': 2, 'unchanged_count': 1}
+    updated = stored_cases(session)
+    assert {country: cases for country, (_, cases) in updated.items()} == {
+        'France': 150, 'Japan': 200, 'Peru': 50
+    }
+    # Updates keep the row of the existing country
+    assert updated['France'][0] == inserted['France'][0]
+    assert updated['Japan'][0] == inserted['Japan'][0]
+    
+    today = session.query(app.CovidSnapshot.snapshot_date).distinct().one()[0]
+    snapshot = dict(record('France', 175), snapshot_date=today)
+    del snapshot['country_code'], snapshot['continent']
+    older = dict(snapshot, snapshot_date=date(2020, 1, 1), total_cases=1)
+    app.write_snapshots([older, dict(older, total_cases=2), snapshot])
+    session.commit()
+    
+    snapshots = {
+        (country, snapshot_date): total_cases
+        for country, snapshot_date, total_cases in session.query(
+            app.CovidSnapshot.country, app.CovidSnapshot.snapshot_date, app.CovidSnapshot.total_cases
+        )
+    }
+    assert snapshots == {
+        ('France', date(2020, 1, 1)): 2,
+        ('France', today): 175,
+        ('Japan', today): 200,
+        ('Peru', today): 50
+    }
+
+
+def test_backfill_snapshots_is_idempotent(session):
+    app.store_data_in_db([record('France', 100), record('Japan', 200, 'Asia')])
+    session.query(app.CovidSnapshot).filter_by(country='Japan').delete()
+    session.commit()
+    
+    # A second worker seeding at startup finds France's row already there
+    app.backfill_snapshots()
+    app.backfill_snapshots()
+    session.commit()
+    assert sorted(
+        country for country, in session.query(app.CovidSnapshot.country)
+    ) == ['France', 'Japan']